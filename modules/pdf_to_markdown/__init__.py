@@ -5,6 +5,7 @@ Uses the Marker library to convert PDF documents to Markdown format.
 Supports batch processing of PDFs from input folder to output folder.
 """
 
+from .admission import MemoryAdmissionController
 from .converter import PDFToMarkdownConverter
 
-__all__ = ["PDFToMarkdownConverter"]
+__all__ = ["MemoryAdmissionController", "PDFToMarkdownConverter"]
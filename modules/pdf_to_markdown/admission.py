@@ -0,0 +1,249 @@
+"""
+Memory-aware admission control for batch PDF conversion.
+"""
+
+from pathlib import Path
+from typing import Optional
+import logging
+import mmap
+import re
+import threading
+
+# Rough heuristics for the resident memory a Marker conversion needs. Layout,
+# OCR and table models hold per-page images and intermediate tensors, so the
+# footprint grows with page count; the file size term covers embedded images.
+DEFAULT_BASE_MB = 256.0
+DEFAULT_PER_PAGE_MB = 24.0
+DEFAULT_FILE_SIZE_FACTOR = 4.0
+# Resident memory of the Marker model set (layout, OCR, tables) that every
+# worker loads once and keeps for its lifetime
+DEFAULT_MODEL_MB = 4096.0
+# Used to guess a page count when no page objects can be found
+DEFAULT_BYTES_PER_PAGE = 100 * 1024
+
+# Page objects ("/Type /Page", not "/Type /Pages") in uncompressed PDF bodies
+_PAGE_OBJECT_RE = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+
+
+class MemoryAdmissionController:
+    """Admits conversion jobs while projected memory use stays in budget.
+
+    Each job reserves its estimated footprint before it starts and releases
+    it when it finishes. ``acquire`` blocks the caller until the job fits,
+    which applies backpressure to whatever is feeding the work queue.
+    Documents at or above ``large_document_mb`` run with an exclusive slot.
+
+    Every worker also holds its own copy of the models, so ``model_mb`` per
+    worker is reserved against the budget up front and the number of
+    workers is capped to what the budget can hold.
+    """
+
+    def __init__(
+        self,
+        budget_mb: Optional[float] = None,
+        max_concurrent: Optional[int] = None,
+        large_document_mb: Optional[float] = None,
+        base_mb: float = DEFAULT_BASE_MB,
+        per_page_mb: float = DEFAULT_PER_PAGE_MB,
+        file_size_factor: float = DEFAULT_FILE_SIZE_FACTOR,
+        model_mb: float = DEFAULT_MODEL_MB,
+    ):
+        """Initialize the controller.
+
+        Args:
+            budget_mb: Total memory budget in MB. If None, memory is not
+                limited and only ``max_concurrent`` applies.
+            max_concurrent: Maximum number of jobs admitted at once, one
+                per worker. With a budget, it is capped (with a warning) so
+                the workers' models leave room for documents. If None, it
+                is as many workers as the budget can hold, or unlimited
+                without a budget.
+            large_document_mb: Estimate at which a document is considered
+                large and gets an exclusive slot. If None, defaults to half
+                of the budget left after the workers' models (no exclusive
+                slots without a budget).
+            base_mb: Fixed per-document overhead in MB.
+            per_page_mb: Estimated memory per page in MB.
+            file_size_factor: Multiplier applied to the file size in MB.
+            model_mb: Memory in MB each worker holds for its models.
+
+        Raises:
+            ValueError: If a limit is not positive, if a memory heuristic
+                is negative, or if the budget can't hold one worker's models
+        """
+        if budget_mb is not None and budget_mb <= 0:
+            raise ValueError(f"budget_mb must be positive, got {budget_mb}")
+        if max_concurrent is not None and max_concurrent < 1:
+            raise ValueError(f"max_concurrent must be at least 1, got {max_concurrent}")
+        if large_document_mb is not None and large_document_mb <= 0:
+            raise ValueError(
+                f"large_document_mb must be positive, got {large_document_mb}"
+            )
+        for name, value in (
+            ("base_mb", base_mb),
+            ("per_page_mb", per_page_mb),
+            ("file_size_factor", file_size_factor),
+            ("model_mb", model_mb),
+        ):
+            if value < 0:
+                raise ValueError(f"{name} must not be negative, got {value}")
+
+        self.logger = logging.getLogger(__name__)
+
+        if budget_mb is not None and model_mb > 0:
+            # Leave some of the budget for documents, not just models
+            worker_limit = int(budget_mb // model_mb)
+            if worker_limit * model_mb >= budget_mb:
+                worker_limit -= 1
+            if worker_limit < 1:
+                raise ValueError(
+                    f"budget_mb ({budget_mb}) must exceed the models of one "
+                    f"worker ({model_mb}MB)"
+                )
+            if max_concurrent is None:
+                max_concurrent = worker_limit
+            elif max_concurrent > worker_limit:
+                self.logger.warning(
+                    "Capping workers at %d: models for %d workers (%.0fMB each) "
+                    "don't fit the %.0fMB budget",
+                    worker_limit,
+                    max_concurrent,
+                    model_mb,
+                    budget_mb,
+                )
+                max_concurrent = worker_limit
+
+        self.budget_mb = budget_mb
+        self.max_concurrent = max_concurrent
+        self.model_mb = model_mb
+        self.models_mb = model_mb * max_concurrent if max_concurrent else 0.0
+        if large_document_mb is None and budget_mb is not None:
+            large_document_mb = (budget_mb - self.models_mb) / 2
+        self.large_document_mb = large_document_mb
+        self.base_mb = base_mb
+        self.per_page_mb = per_page_mb
+        self.file_size_factor = file_size_factor
+
+        self._condition = threading.Condition()
+        self._reserved_mb = 0.0
+        self._active = 0
+        self._exclusive = False
+
+    @property
+    def reserved_mb(self) -> float:
+        """Memory currently reserved by admitted jobs, in MB.
+
+        Excludes ``models_mb``, which stays reserved for the whole run.
+        """
+        with self._condition:
+            return self._reserved_mb
+
+    @property
+    def active(self) -> int:
+        """Number of jobs currently admitted."""
+        with self._condition:
+            return self._active
+
+    def estimate_memory_mb(self, pdf_path: str) -> float:
+        """
+        Estimate the peak memory needed to convert a PDF.
+
+        Args:
+            pdf_path: Path to the PDF file
+
+        Returns:
+            Estimated memory footprint in MB
+        """
+        size_bytes = Path(pdf_path).stat().st_size
+        page_count = self._count_pages(pdf_path, size_bytes)
+        size_mb = size_bytes / (1024**2)
+        return (
+            self.base_mb
+            + self.per_page_mb * page_count
+            + self.file_size_factor * size_mb
+        )
+
+    def is_large(self, estimate_mb: float) -> bool:
+        """Whether a job of this size must run on its own."""
+        return (
+            self.large_document_mb is not None and estimate_mb >= self.large_document_mb
+        )
+
+    def acquire(self, estimate_mb: float) -> None:
+        """
+        Block until a job with the given estimate can be admitted.
+
+        A job is always admitted when nothing else is running, so a single
+        document larger than the whole budget still makes progress.
+
+        Args:
+            estimate_mb: Estimated memory footprint of the job in MB
+        """
+        exclusive = self.is_large(estimate_mb)
+        with self._condition:
+            self._condition.wait_for(lambda: self._can_admit(estimate_mb, exclusive))
+            self._reserved_mb += estimate_mb
+            self._active += 1
+            self._exclusive = exclusive
+
+    def release(self, estimate_mb: float) -> None:
+        """
+        Release the reservation of a finished job.
+
+        This assumes the job's memory is available again once it ends. A
+        long-lived worker process keeps its peak (allocator caches), so
+        callers should retire the worker after an exclusive job, as
+        ``convert_folder`` does. Smaller jobs are assumed to reuse the
+        memory their worker already holds.
+
+        Args:
+            estimate_mb: Estimate previously passed to ``acquire``
+        """
+        with self._condition:
+            self._reserved_mb -= estimate_mb
+            self._active -= 1
+            if self._active == 0:
+                self._exclusive = False
+                self._reserved_mb = 0.0
+            self._condition.notify_all()
+
+    def _can_admit(self, estimate_mb: float, exclusive: bool) -> bool:
+        """Check admission against current reservations. Caller holds lock."""
+        if self._active == 0:
+            return True
+        if exclusive or self._exclusive:
+            return False
+        if self.max_concurrent is not None and self._active >= self.max_concurrent:
+            return False
+        if self.budget_mb is not None:
+            projected_mb = self.models_mb + self._reserved_mb + estimate_mb
+            return projected_mb <= self.budget_mb
+        return True
+
+    def _count_pages(self, pdf_path: str, size_bytes: int) -> int:
+        """Count page objects, falling back to a size-based guess.
+
+        The file is scanned directly rather than opened with PDFium, which
+        isn't thread-safe and may be in use by a running conversion. Page
+        objects inside compressed object streams, the norm since PDF 1.5,
+        aren't visible this way. The size-based guess can then be far off,
+        e.g. a large scan may be treated as exclusive, so it is logged.
+        """
+        try:
+            with open(pdf_path, "rb") as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    page_count = sum(1 for _ in _PAGE_OBJECT_RE.finditer(data))
+        except (OSError, ValueError) as e:
+            self.logger.debug("Could not read page count of %s: %s", pdf_path, e)
+            page_count = 0
+        if page_count:
+            return page_count
+
+        page_count = max(1, size_bytes // DEFAULT_BYTES_PER_PAGE)
+        self.logger.info(
+            "No page objects found in %s (compressed object streams?); "
+            "guessing %d pages from its size",
+            pdf_path,
+            page_count,
+        )
+        return page_count
@@ -2,9 +2,18 @@
 PDF to Markdown converter using the Marker library.
 """
 
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
 from pathlib import Path
 from typing import Any, Optional
+import functools
 import logging
+import multiprocessing
+import threading
 
 try:
     # External package without type stubs; silence mypy for these imports
@@ -16,12 +25,20 @@ except ImportError:
         "marker-pdf library is required. Install with: pip install marker-pdf"
     )
 
+from .admission import DEFAULT_MODEL_MB, MemoryAdmissionController
+
 
 class PDFToMarkdownConverter:
     """Converts PDF files to Markdown using the Marker library.
 
     Supports single-file conversion and batch processing from an input
     folder to an output folder.
+
+    An instance is not safe to convert with from several threads at once.
+    Marker renders pages through PDFium, which must never be called
+    concurrently, even on different documents. The lock in
+    ``_get_converter`` only guards lazy loading; concurrent batch
+    conversion runs in worker processes with one converter each.
     """
 
     def __init__(self, config: Optional[dict] = None):
@@ -33,10 +50,16 @@ class PDFToMarkdownConverter:
         """
         self.config = config
         self._converter: Any = None
+        self._converter_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
 
     def _get_converter(self):
         """Lazy load the PDF converter."""
+        with self._converter_lock:
+            return self._load_converter()
+
+    def _load_converter(self):
+        """Load the PDF converter if needed. Caller holds the lock."""
         if self._converter is None:
             self.logger.info("Loading Marker PDF converter...")
             try:
@@ -121,21 +144,53 @@ class PDFToMarkdownConverter:
             raise
 
     def convert_folder(
-        self, input_folder: str, output_folder: str, overwrite: bool = False
+        self,
+        input_folder: str,
+        output_folder: str,
+        overwrite: bool = False,
+        max_workers: int = 1,
+        memory_budget_mb: Optional[float] = None,
+        large_document_mb: Optional[float] = None,
+        model_mb: float = DEFAULT_MODEL_MB,
     ) -> list[str]:
         """
         Convert all PDF files in a folder to Markdown.
 
+        With ``max_workers`` above 1, files are converted concurrently in
+        worker processes, each loading its own copy of the Marker models.
+        Those models (``model_mb`` per worker) are charged against
+        ``memory_budget_mb`` up front, and the worker count is capped so
+        they leave room for documents. Each file's memory footprint is
+        estimated from its page count and size, and a file is only started
+        while the projected total stays within the budget; otherwise the
+        folder scan waits for running conversions to finish. Large files
+        run on their own, in a fresh worker process that exits afterwards,
+        since workers don't hand memory back to the system between files.
+
+        The budget covers system memory only. With CUDA, each worker also
+        holds its models in GPU memory, so ``max_workers`` must fit VRAM.
+
         Args:
             input_folder: Path to folder containing PDF files
             output_folder: Path to folder for output Markdown files
             overwrite: Whether to overwrite existing Markdown files
+            max_workers: Maximum number of concurrent conversions
+            memory_budget_mb: Memory budget in MB for the workers' models
+                and the documents being converted. If None, only
+                ``max_workers`` limits concurrency.
+            large_document_mb: Estimated footprint in MB at which a file
+                gets an exclusive slot. Defaults to half the budget left
+                after the workers' models.
+            model_mb: Memory in MB each worker holds for its models.
 
         Returns:
             List of paths to created Markdown files
 
         Raises:
             FileNotFoundError: If input folder doesn't exist
+            ValueError: If max_workers, memory_budget_mb or large_document_mb
+                is not positive, if model_mb is negative, or if the budget
+                can't hold one worker's models
         """
         input_folder_obj = Path(input_folder)
         output_folder_obj = Path(output_folder)
@@ -144,6 +199,15 @@ class PDFToMarkdownConverter:
             msg = f"Input folder not found: {input_folder_obj}"
             raise FileNotFoundError(msg)
 
+        admission = MemoryAdmissionController(
+            budget_mb=memory_budget_mb,
+            max_concurrent=max_workers,
+            large_document_mb=large_document_mb,
+            model_mb=model_mb,
+        )
+        # The budget may allow fewer workers than requested
+        workers = admission.max_concurrent or max_workers
+
         # Create output folder if it doesn't exist
         output_folder_obj.mkdir(parents=True, exist_ok=True)
 
@@ -155,20 +219,72 @@ class PDFToMarkdownConverter:
 
         self.logger.info(f"Found {len(pdf_files)} PDF files to convert")
 
-        converted_files = []
-        for pdf_file in pdf_files:
-            output_file = output_folder_obj / f"{pdf_file.stem}.md"
+        # PDFium isn't thread-safe, so concurrent conversions need separate
+        # processes. A single worker thread keeps the shared, lazily loaded
+        # converter for sequential runs.
+        executor: Optional[Executor] = None
+        after_exclusive = False
+        submitted: list[tuple[Path, Future]] = []
+        try:
+            for pdf_file in pdf_files:
+                output_file = output_folder_obj / f"{pdf_file.stem}.md"
 
-            # Skip if file exists and overwrite is False
-            if output_file.exists() and not overwrite:
-                self.logger.info(f"Skipping {pdf_file.name} (output exists)")
-                continue
+                # Skip if file exists and overwrite is False
+                if output_file.exists() and not overwrite:
+                    self.logger.info(f"Skipping {pdf_file.name} (output exists)")
+                    continue
 
-            try:
-                converted_path = self.convert_single_file(
-                    str(pdf_file), str(output_file)
+                try:
+                    estimate_mb = admission.estimate_memory_mb(str(pdf_file))
+                except OSError as e:
+                    self.logger.error("Failed to convert %s: %s", pdf_file.name, str(e))
+                    # Continue with other files even if one fails
+                    continue
+                self.logger.debug("Estimated %.0fMB for %s", estimate_mb, pdf_file.name)
+                exclusive = admission.is_large(estimate_mb)
+                # Blocks until the file fits, holding back the rest of the scan
+                admission.acquire(estimate_mb)
+
+                # Worker processes keep their peak memory after a document
+                # (allocator caches), so an exclusive document gets a fresh
+                # worker that exits before anything else is admitted. Both
+                # pools are idle here, since exclusive documents run alone.
+                if workers > 1 and (exclusive or after_exclusive):
+                    if executor is not None:
+                        executor.shutdown(wait=True)
+                    executor = None
+                after_exclusive = exclusive
+                if executor is None:
+                    if workers > 1:
+                        executor = self._create_worker_pool(1 if exclusive else workers)
+                    else:
+                        executor = ThreadPoolExecutor(max_workers=1)
+
+                try:
+                    if workers > 1:
+                        future = executor.submit(
+                            _convert_in_worker, str(pdf_file), str(output_file)
+                        )
+                    else:
+                        future = executor.submit(
+                            self.convert_single_file, str(pdf_file), str(output_file)
+                        )
+                except Exception as e:
+                    admission.release(estimate_mb)
+                    self.logger.error("Failed to convert %s: %s", pdf_file.name, str(e))
+                    continue
+                future.add_done_callback(
+                    functools.partial(_release_reservation, admission, estimate_mb)
                 )
-                converted_files.append(converted_path)
+                submitted.append((pdf_file, future))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+        converted_files = []
+        for pdf_file, future in submitted:
+            try:
+                converted_files.append(future.result())
             except Exception as e:
                 self.logger.error("Failed to convert %s: %s", pdf_file.name, str(e))
                 # Continue with other files even if one fails
@@ -176,6 +292,20 @@ class PDFToMarkdownConverter:
         self.logger.info("Successfully converted %d files", len(converted_files))
         return converted_files
 
+    def _create_worker_pool(self, processes: int) -> Executor:
+        """Create a pool of worker processes, each with its own converter.
+
+        Workers are spawned rather than forked: CUDA can't be re-initialized
+        in a fork of a process that has already loaded models, and Windows
+        only supports spawn.
+        """
+        return ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(type(self), self.config),
+        )
+
     def get_supported_extensions(self) -> list[str]:
         """
         Get list of supported file extensions.
@@ -184,3 +314,29 @@ class PDFToMarkdownConverter:
             List of supported extensions
         """
         return [".pdf"]
+
+
+# Converter owned by a batch worker process, created by _init_worker
+_worker_converter: Optional[PDFToMarkdownConverter] = None
+
+
+def _init_worker(
+    converter_cls: type[PDFToMarkdownConverter], config: Optional[dict]
+) -> None:
+    """Create the converter for a batch worker process."""
+    global _worker_converter
+    _worker_converter = converter_cls(config)
+
+
+def _release_reservation(
+    admission: MemoryAdmissionController, estimate_mb: float, _: Future
+) -> None:
+    """Release a file's memory reservation once its future is done."""
+    admission.release(estimate_mb)
+
+
+def _convert_in_worker(pdf_path: str, output_path: str) -> str:
+    """Convert one file with the worker process's converter."""
+    if _worker_converter is None:
+        raise RuntimeError("Worker converter not initialized")
+    return _worker_converter.convert_single_file(pdf_path, output_path)
@@ -0,0 +1,264 @@
+"""
+Unit tests for the memory-aware admission controller.
+"""
+
+import logging
+import pytest
+import tempfile
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from modules.pdf_to_markdown.admission import MemoryAdmissionController
+
+
+def _object_stream_pdf(page_count: int) -> bytes:
+    """Build a PDF 1.5 file whose objects all live in a compressed stream."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids ["
+        + b" ".join(b"%d 0 R" % (3 + i) for i in range(page_count))
+        + b"] /Count %d >>" % page_count,
+    ]
+    objects += [b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>"] * page_count
+
+    # Object stream: "<num> <offset>" pairs, then the objects themselves
+    body = b""
+    offsets = []
+    for obj in objects:
+        offsets.append(len(body))
+        body += obj + b"\n"
+    header = b" ".join(b"%d %d" % (i + 1, off) for i, off in enumerate(offsets))
+    header += b"\n"
+    stream = zlib.compress(header + body)
+
+    objstm_num = len(objects) + 1
+    xref_num = objstm_num + 1
+    pdf = b"%PDF-1.5\n"
+    objstm_offset = len(pdf)
+    pdf += (
+        b"%d 0 obj\n<< /Type /ObjStm /N %d /First %d /Filter /FlateDecode "
+        b"/Length %d >>\nstream\n"
+        % (objstm_num, len(objects), len(header), len(stream))
+        + stream
+        + b"\nendstream\nendobj\n"
+    )
+
+    # Cross-reference stream with 1-byte type, 4-byte field 2, 2-byte field 3
+    xref_offset = len(pdf)
+    entries = b"\x00" + (0).to_bytes(4, "big") + b"\xff\xff"
+    for i in range(len(objects)):
+        entries += b"\x02" + objstm_num.to_bytes(4, "big") + i.to_bytes(2, "big")
+    entries += b"\x01" + objstm_offset.to_bytes(4, "big") + b"\x00\x00"
+    entries += b"\x01" + xref_offset.to_bytes(4, "big") + b"\x00\x00"
+    pdf += (
+        b"%d 0 obj\n<< /Type /XRef /Size %d /W [1 4 2] /Root 1 0 R "
+        b"/Length %d >>\nstream\n" % (xref_num, xref_num + 1, len(entries))
+        + entries
+        + b"\nendstream\nendobj\n"
+    )
+    pdf += b"startxref\n%d\n%%%%EOF\n" % xref_offset
+    return pdf
+
+
+class TestMemoryAdmissionController:
+    """Test cases for MemoryAdmissionController class."""
+
+    def _acquire_in_thread(self, controller, estimate_mb):
+        """Start a thread blocked on acquire and return it with its event."""
+        admitted = threading.Event()
+
+        def target():
+            controller.acquire(estimate_mb)
+            admitted.set()
+
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread, admitted
+
+    def test_invalid_limits(self):
+        """Test that non-positive limits are rejected."""
+        with pytest.raises(ValueError):
+            MemoryAdmissionController(budget_mb=0)
+        with pytest.raises(ValueError):
+            MemoryAdmissionController(max_concurrent=0)
+        with pytest.raises(ValueError):
+            MemoryAdmissionController(budget_mb=1000, large_document_mb=0)
+
+    def test_negative_heuristics(self):
+        """Test that negative memory heuristics are rejected."""
+        with pytest.raises(ValueError):
+            MemoryAdmissionController(base_mb=-1)
+        with pytest.raises(ValueError):
+            MemoryAdmissionController(per_page_mb=-1)
+        with pytest.raises(ValueError):
+            MemoryAdmissionController(file_size_factor=-1)
+        with pytest.raises(ValueError):
+            MemoryAdmissionController(model_mb=-1)
+
+    def test_budget_must_hold_one_worker(self):
+        """Test a budget that can't hold one worker's models is rejected."""
+        with pytest.raises(ValueError):
+            MemoryAdmissionController(budget_mb=4000, model_mb=4000)
+
+    def test_workers_capped_by_model_memory(self):
+        """Test the worker count is capped so models leave room for documents."""
+        controller = MemoryAdmissionController(
+            budget_mb=10000, max_concurrent=8, model_mb=3000
+        )
+        assert controller.max_concurrent == 3
+        assert controller.models_mb == 9000
+        assert controller.large_document_mb == 500
+
+        uncapped = MemoryAdmissionController(
+            budget_mb=10000, max_concurrent=2, model_mb=3000
+        )
+        assert uncapped.max_concurrent == 2
+
+        derived = MemoryAdmissionController(budget_mb=10000, model_mb=3000)
+        assert derived.max_concurrent == 3
+
+    def test_models_reserved_against_budget(self):
+        """Test documents only get the budget left after workers' models."""
+        controller = MemoryAdmissionController(
+            budget_mb=3000, max_concurrent=2, model_mb=1000, large_document_mb=900
+        )
+        controller.acquire(600)
+
+        thread, admitted = self._acquire_in_thread(controller, 600)
+        assert not admitted.wait(0.1)
+
+        controller.release(600)
+        assert admitted.wait(1)
+        thread.join(1)
+
+    def test_large_document_default(self):
+        """Test large document threshold defaults to half the budget."""
+        controller = MemoryAdmissionController(budget_mb=1000, model_mb=0)
+        assert controller.large_document_mb == 500
+        assert controller.is_large(500)
+        assert not controller.is_large(499)
+
+        unbounded = MemoryAdmissionController()
+        assert not unbounded.is_large(10**9)
+
+    def test_estimate_memory_uses_page_count(self):
+        """Test memory estimate grows with page count and file size."""
+        controller = MemoryAdmissionController(
+            base_mb=100, per_page_mb=10, file_size_factor=0
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = Path(temp_dir) / "test.pdf"
+            pdf_path.write_text("dummy pdf content")
+
+            controller._count_pages = lambda path, size: 5
+            assert controller.estimate_memory_mb(str(pdf_path)) == 150
+
+    def test_count_pages_from_page_objects(self):
+        """Test pages are counted from page objects, not the page tree."""
+        controller = MemoryAdmissionController(
+            base_mb=0, per_page_mb=1, file_size_factor=0
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = Path(temp_dir) / "test.pdf"
+            pdf_path.write_bytes(
+                b"1 0 obj << /Type /Pages /Count 2 >> endobj\n"
+                b"2 0 obj << /Type /Page /Parent 1 0 R >> endobj\n"
+                b"3 0 obj << /Type/Page /Parent 1 0 R >> endobj\n"
+            )
+
+            assert controller.estimate_memory_mb(str(pdf_path)) == 2
+
+    def test_count_pages_object_stream_falls_back_to_size(self, caplog):
+        """Test pages in compressed object streams fall back to a logged guess."""
+        controller = MemoryAdmissionController(
+            base_mb=0, per_page_mb=1, file_size_factor=0
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = Path(temp_dir) / "test.pdf"
+            pdf_path.write_bytes(_object_stream_pdf(page_count=3))
+
+            with caplog.at_level(logging.INFO):
+                estimate = controller.estimate_memory_mb(str(pdf_path))
+
+            # The 3 pages are hidden; a file this small guesses 1 page
+            assert estimate == 1
+            assert "No page objects found" in caplog.text
+
+    def test_estimate_memory_falls_back_to_size(self):
+        """Test page count is guessed from size for unreadable PDFs."""
+        controller = MemoryAdmissionController(
+            base_mb=0, per_page_mb=1, file_size_factor=0
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            pdf_path = Path(temp_dir) / "test.pdf"
+            pdf_path.write_bytes(b"x" * 300 * 1024)
+
+            assert controller.estimate_memory_mb(str(pdf_path)) == 3
+
+    def test_admits_within_budget(self):
+        """Test jobs are admitted while they fit in the budget."""
+        controller = MemoryAdmissionController(budget_mb=1000, model_mb=0)
+        controller.acquire(300)
+        controller.acquire(300)
+        assert controller.active == 2
+        assert controller.reserved_mb == 600
+
+        controller.release(300)
+        controller.release(300)
+        assert controller.active == 0
+        assert controller.reserved_mb == 0
+
+    def test_blocks_until_budget_frees(self):
+        """Test acquire blocks while the job would exceed the budget."""
+        controller = MemoryAdmissionController(budget_mb=1000, model_mb=0)
+        controller.acquire(400)
+        controller.acquire(400)
+
+        thread, admitted = self._acquire_in_thread(controller, 400)
+        assert not admitted.wait(0.1)
+
+        controller.release(400)
+        assert admitted.wait(1)
+        thread.join(1)
+        assert controller.reserved_mb == 800
+
+    def test_blocks_at_max_concurrent(self):
+        """Test acquire blocks once max_concurrent jobs are running."""
+        controller = MemoryAdmissionController(max_concurrent=1)
+        controller.acquire(10)
+
+        thread, admitted = self._acquire_in_thread(controller, 10)
+        assert not admitted.wait(0.1)
+
+        controller.release(10)
+        assert admitted.wait(1)
+        thread.join(1)
+
+    def test_large_document_runs_exclusively(self):
+        """Test large documents wait for, and then block, other jobs."""
+        controller = MemoryAdmissionController(budget_mb=1000, model_mb=0)
+        controller.acquire(100)
+
+        thread, admitted = self._acquire_in_thread(controller, 600)
+        assert not admitted.wait(0.1)
+
+        controller.release(100)
+        assert admitted.wait(1)
+        thread.join(1)
+
+        thread, admitted = self._acquire_in_thread(controller, 10)
+        assert not admitted.wait(0.1)
+
+        controller.release(600)
+        assert admitted.wait(1)
+        thread.join(1)
+
+    def test_oversized_document_admitted_when_idle(self):
+        """Test a job larger than the budget still runs when nothing else is."""
+        controller = MemoryAdmissionController(budget_mb=1000, model_mb=0)
+        start = time.monotonic()
+        controller.acquire(5000)
+        assert time.monotonic() - start < 1
+        assert controller.active == 1
@@ -2,14 +2,53 @@
 Unit tests for PDF to Markdown converter.
 """
 
+import logging
+import os
 import pytest
 import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
+from modules.pdf_to_markdown.admission import MemoryAdmissionController
+from modules.pdf_to_markdown import converter as converter_module
 from modules.pdf_to_markdown.converter import PDFToMarkdownConverter
 
 
+def _thread_pool(max_workers, mp_context=None, **kwargs):
+    """Stand-in for ProcessPoolExecutor that runs workers as threads."""
+    return ThreadPoolExecutor(max_workers=max_workers, **kwargs)
+
+
+class StubConverter(PDFToMarkdownConverter):
+    """Converter for spawned worker processes, where mocks don't reach.
+
+    Writes the worker's PID instead of converting. A file whose name starts
+    with "crash" kills the worker, as the OOM killer would, sooner than
+    other files take to convert, so another file is always in flight.
+    """
+
+    def convert_single_file(self, pdf_path, output_path=None):
+        if Path(pdf_path).stem.startswith("crash"):
+            time.sleep(0.1)
+            os._exit(1)
+        time.sleep(0.5)
+        Path(output_path).write_text(str(os.getpid()), encoding="utf-8")
+        return output_path
+
+
+class RecordingController(MemoryAdmissionController):
+    """Admission controller that keeps every instance for inspection."""
+
+    instances: list[MemoryAdmissionController] = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.instances.append(self)
+
+
 class TestPDFToMarkdownConverter:
     """Test cases for PDFToMarkdownConverter class."""
 
@@ -259,3 +298,246 @@ class TestPDFToMarkdownConverter:
             # Second conversion should reuse converter
             converter.convert_single_file(str(pdf_path))
             mock_create_model_dict.assert_called_once()  # Still only called once
+
+    # Mocks don't reach worker processes; run the workers as threads instead
+    @patch("modules.pdf_to_markdown.converter.ProcessPoolExecutor", _thread_pool)
+    @patch("modules.pdf_to_markdown.converter.text_from_rendered")
+    @patch("modules.pdf_to_markdown.converter.PdfConverter")
+    @patch("modules.pdf_to_markdown.converter.create_model_dict")
+    def test_convert_folder_concurrent_with_budget(
+        self, mock_create_model_dict, mock_pdf_converter, mock_text_from_rendered
+    ):
+        """Test concurrent conversion respects workers, budget and large files."""
+        # Estimated footprint per file; "large" is above large_document_mb
+        estimates = {
+            "small1": 300,
+            "small2": 300,
+            "small3": 300,
+            "medium": 600,
+            "large": 900,
+            "small4": 300,
+        }
+        lock = threading.Lock()
+        running: set[str] = set()
+        snapshots: list[set[str]] = []
+
+        def convert(pdf_path):
+            """Block briefly, recording which files run at the same time."""
+            name = Path(pdf_path).stem
+            with lock:
+                running.add(name)
+                snapshots.append(set(running))
+            time.sleep(0.05)
+            with lock:
+                running.discard(name)
+
+        mock_create_model_dict.return_value = {"models": "dict"}
+        mock_converter_instance = MagicMock(side_effect=convert)
+        mock_pdf_converter.return_value = mock_converter_instance
+        mock_text_from_rendered.return_value = ("# Converted Content", None, None)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_folder = Path(temp_dir) / "input"
+            input_folder.mkdir()
+            output_folder = Path(temp_dir) / "output"
+
+            # Create dummy PDF files
+            for name in estimates:
+                (input_folder / f"{name}.pdf").write_text(f"dummy pdf {name}")
+
+            # Convert
+            with patch.object(
+                MemoryAdmissionController,
+                "estimate_memory_mb",
+                side_effect=lambda path: estimates[Path(path).stem],
+            ):
+                result = self.converter.convert_folder(
+                    str(input_folder),
+                    str(output_folder),
+                    max_workers=3,
+                    memory_budget_mb=1000,
+                    large_document_mb=800,
+                    model_mb=0,
+                )
+
+            # Verify - all files converted
+            assert len(result) == len(estimates)
+            for name in estimates:
+                assert (output_folder / f"{name}.md").exists()
+            assert mock_converter_instance.call_count == len(estimates)
+
+            # Files ran concurrently, but never more than max_workers
+            peak = max(len(snapshot) for snapshot in snapshots)
+            assert 1 < peak <= 3
+
+            # Concurrent files never exceeded the budget, so "medium" had to
+            # wait for small files to finish rather than join all three
+            for snapshot in snapshots:
+                assert sum(estimates[name] for name in snapshot) <= 1000
+
+            # The large file never overlapped with another file
+            for snapshot in snapshots:
+                if "large" in snapshot:
+                    assert snapshot == {"large"}
+
+    def test_convert_folder_budget_too_small_for_models(self):
+        """Test conversion rejects a budget that can't hold the models."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with pytest.raises(ValueError):
+                self.converter.convert_folder(
+                    temp_dir, temp_dir, memory_budget_mb=1000, model_mb=2000
+                )
+
+    def test_convert_folder_invalid_workers(self):
+        """Test conversion rejects a non-positive worker count."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with pytest.raises(ValueError):
+                self.converter.convert_folder(temp_dir, temp_dir, max_workers=0)
+
+    @patch("modules.pdf_to_markdown.converter.text_from_rendered")
+    @patch("modules.pdf_to_markdown.converter.PdfConverter")
+    @patch("modules.pdf_to_markdown.converter.create_model_dict")
+    def test_convert_folder_skips_unreadable_file(
+        self, mock_create_model_dict, mock_pdf_converter, mock_text_from_rendered
+    ):
+        """Test folder conversion continues past a file that can't be read."""
+        mock_create_model_dict.return_value = {"models": "dict"}
+        mock_converter_instance = MagicMock()
+        mock_pdf_converter.return_value = mock_converter_instance
+        mock_text_from_rendered.return_value = ("# Converted Content", None, None)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_folder = Path(temp_dir) / "input"
+            input_folder.mkdir()
+            output_folder = Path(temp_dir) / "output"
+
+            (input_folder / "a.pdf").write_text("dummy pdf")
+            dangling = input_folder / "b.pdf"
+            try:
+                dangling.symlink_to(Path(temp_dir) / "missing.pdf")
+            except OSError:
+                pytest.skip("Symlinks not supported on this platform")
+
+            result = self.converter.convert_folder(
+                str(input_folder), str(output_folder)
+            )
+
+            assert result == [str(output_folder / "a.md")]
+            assert not (output_folder / "b.md").exists()
+
+    @patch(
+        "modules.pdf_to_markdown.converter.MemoryAdmissionController",
+        RecordingController,
+    )
+    def test_convert_folder_worker_processes(self):
+        """Test concurrent conversion runs in separate worker processes."""
+        RecordingController.instances.clear()
+        converter = StubConverter()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_folder = Path(temp_dir) / "input"
+            input_folder.mkdir()
+            output_folder = Path(temp_dir) / "output"
+
+            for name in ("a", "b", "c"):
+                (input_folder / f"{name}.pdf").write_text(f"dummy pdf {name}")
+
+            result = converter.convert_folder(
+                str(input_folder), str(output_folder), max_workers=2
+            )
+
+            # Verify - converted by workers, not this process
+            assert len(result) == 3
+            for path in result:
+                worker_pid = int(Path(path).read_text(encoding="utf-8"))
+                assert worker_pid != os.getpid()
+
+            # Reservations were released by the process futures
+            (admission,) = RecordingController.instances
+            assert admission.active == 0
+            assert admission.reserved_mb == 0
+
+    @patch(
+        "modules.pdf_to_markdown.converter.MemoryAdmissionController",
+        RecordingController,
+    )
+    def test_convert_folder_broken_worker_pool(self, caplog):
+        """Test a killed worker fails the remaining files instead of hanging."""
+        RecordingController.instances.clear()
+        converter = StubConverter()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_folder = Path(temp_dir) / "input"
+            input_folder.mkdir()
+            output_folder = Path(temp_dir) / "output"
+
+            names = ("crash", "a", "b", "c")
+            for name in names:
+                (input_folder / f"{name}.pdf").write_text(f"dummy pdf {name}")
+
+            results: list[list[str]] = []
+            thread = threading.Thread(
+                target=lambda: results.append(
+                    converter.convert_folder(
+                        str(input_folder), str(output_folder), max_workers=2
+                    )
+                ),
+                daemon=True,
+            )
+            with caplog.at_level(logging.ERROR):
+                thread.start()
+                thread.join(60)
+            assert not thread.is_alive(), "convert_folder hung on a broken pool"
+
+            # Verify - the crash took down at least one other file, and
+            # every file not converted was reported as failed
+            (result,) = results
+            converted = {Path(path).stem for path in result}
+            assert "crash" not in converted
+            assert len(converted) < len(names) - 1
+            for name in set(names) - converted:
+                assert f"Failed to convert {name}.pdf" in caplog.text
+
+            (admission,) = RecordingController.instances
+            assert admission.active == 0
+            assert admission.reserved_mb == 0
+
+    def test_convert_in_worker_not_initialized(self):
+        """Test the worker entry point requires an initialized converter."""
+        with patch.object(converter_module, "_worker_converter", None):
+            with pytest.raises(RuntimeError):
+                converter_module._convert_in_worker("test.pdf", "test.md")
+
+    def test_convert_folder_exclusive_document_gets_fresh_worker(self):
+        """Test a large document runs in a worker process of its own."""
+        converter = StubConverter()
+        estimates = {"small1": 100, "small2": 100, "large": 900, "small3": 100}
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            input_folder = Path(temp_dir) / "input"
+            input_folder.mkdir()
+            output_folder = Path(temp_dir) / "output"
+
+            for name in estimates:
+                (input_folder / f"{name}.pdf").write_text(f"dummy pdf {name}")
+
+            with patch.object(
+                MemoryAdmissionController,
+                "estimate_memory_mb",
+                side_effect=lambda path: estimates[Path(path).stem],
+            ):
+                result = converter.convert_folder(
+                    str(input_folder),
+                    str(output_folder),
+                    max_workers=2,
+                    large_document_mb=800,
+                )
+
+            # Verify - no other file shared the large document's worker
+            assert len(result) == len(estimates)
+            pids = {
+                Path(path).stem: Path(path).read_text(encoding="utf-8")
+                for path in result
+            }
+            large_pid = pids.pop("large")
+            assert large_pid not in pids.values()